@@ -14,57 +14,131 @@ class CompetitionDataGenerator:
             'شركة الأغذية الوطنية', 'مؤسسة التسويق الحديث', 
             'شركة التوزيع المتكامل', 'مجموعة الأسواق المركزية'
         ]
+        # الأسعار الأساسية بنفس ترتيب self.products
+        self._base_prices = np.array([3.5, 8.0, 15.0, 2.5, 25.0], dtype=np.float32)
         
     def generate_data(self):
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         dates = pd.date_range(start='2024-01-01', end='2024-03-31', freq='D')
+        n_products, n_regions, n_companies = len(self.products), len(self.regions), len(self.companies)
+        n = len(dates) * n_products * n_regions * n_companies
         
-        data = []
-        for date in dates:
-            for product in self.products:
-                for region in self.regions:
-                    for company in self.companies:
-                        base_prices = {'سكر': 3.5, 'أرز': 8.0, 'زيت طهي': 15.0, 'دقيق': 2.5, 'قهوة': 25.0}
-                        base_price = base_prices[product]
-                        
-                        # تطبيق سيناريوهات
-                        price = base_price
-                        if region == 'الرياض' and company == 'شركة الأغذية الوطنية':
-                            price *= 1.3
-                        elif region == 'جدة' and company == 'مؤسسة التسويق الحديث':
-                            price *= 0.7
-                        
-                        # تباين طبيعي
-                        price *= (1 + np.random.normal(0, 0.05))
-                        price = max(price, base_price * 0.8)
-                        
-                        complaint_count = np.random.poisson(2)
-                        market_share = np.random.normal(15, 5)
-                        market_share = max(min(market_share, 40), 5)
-                        
-                        data.append({
-                            'date': date, 'product': product, 'region': region, 
-                            'company': company, 'price': round(price, 2),
-                            'complaint_count': complaint_count,
-                            'market_share': round(market_share, 2)
-                        })
+        # الضرب الديكارتي بنفس ترتيب الصفوف: التاريخ ثم المنتج ثم المنطقة ثم الشركة
+        date = np.repeat(dates.values, n_products * n_regions * n_companies)
+        product_idx = np.tile(np.repeat(np.arange(n_products), n_regions * n_companies), len(dates))
+        region_idx = np.tile(np.repeat(np.arange(n_regions), n_companies), len(dates) * n_products)
+        company_idx = np.tile(np.arange(n_companies), len(dates) * n_products * n_regions)
         
-        return pd.DataFrame(data)
+        base_price = self._base_prices[product_idx]
+        
+        # تطبيق سيناريوهات
+        price = base_price.copy()
+        price[(region_idx == self.regions.index('الرياض'))
+              & (company_idx == self.companies.index('شركة الأغذية الوطنية'))] *= 1.3
+        price[(region_idx == self.regions.index('جدة'))
+              & (company_idx == self.companies.index('مؤسسة التسويق الحديث'))] *= 0.7
+        
+        # تباين طبيعي
+        price *= 1 + rng.normal(0, 0.05, n)
+        price = np.maximum(price, base_price * 0.8)
+        
+        complaint_count = rng.poisson(2, n)
+        market_share = np.clip(rng.normal(15, 5, n), 5, 40)
+        
+        # الأعمدة الرقمية بأصغر نوع يتسع لقيمها (float32/int16)،
+        # والمصفوفات المولدة حديثاً تُستخدم كما هي دون نسخها (copy=False)
+        return pd.DataFrame({
+            'date': date,
+            'product': pd.Categorical.from_codes(product_idx, categories=self.products),
+            'region': pd.Categorical.from_codes(region_idx, categories=self.regions),
+            'company': pd.Categorical.from_codes(company_idx, categories=self.companies),
+            'price': np.round(price, 2).astype(np.float32),
+            'complaint_count': complaint_count.astype(np.int16),
+            'market_share': np.round(market_share, 2).astype(np.float32)
+        }, copy=False)
 
 @st.cache_data
 def load_data():
     generator = CompetitionDataGenerator()
     return generator.generate_data()
 
-# كشف الشذوذ بدون scikit-learn
-def detect_anomalies_simple(df):
-    """كشف شذوذ مبسط باستخدام القيم المتطرفة الإحصائية"""
-    price_mean = df['price'].mean()
-    price_std = df['price'].std()
-    threshold = price_mean + 2 * price_std
+# cache_resource يعيد القاموس نفسه دون تسلسل، فيبقى البحث عن التركيبة O(1) في كل إعادة تشغيل
+@st.cache_resource
+def build_slice_index(_data):
+    """مواقع صفوف كل تركيبة (منتج، منطقة)، تُحسب مرة واحدة عند تحميل البيانات"""
+    return _data.groupby(['product', 'region'], observed=True, sort=False).indices
+
+@st.cache_data
+def build_company_report(_df, product, region):
+    """تقرير أداء الشركات لتركيبة (منتج، منطقة)، يُحسب مرة واحدة لكل تركيبة"""
+    # التجميع المسمى ينتج أعمدة مسطحة مباشرة دون فهرس أعمدة متعدد المستويات
+    return _df.groupby('company', observed=True).agg(
+        price_mean=('price', 'mean'),
+        price_std=('price', 'std'),
+        price_min=('price', 'min'),
+        price_max=('price', 'max'),
+        complaint_count_sum=('complaint_count', 'sum'),
+        market_share_mean=('market_share', 'mean')
+    ).round(2)
+
+@st.cache_data
+def build_company_summary(_df, product, region):
+    """مؤشرات الشركات المشتركة بين النظرة العامة وتحليل الأسعار في تجميع واحد"""
+    return _df.groupby('company', observed=True).agg(
+        price_mean=('price', 'mean'),
+        price_std=('price', 'std'),
+        complaint_count=('complaint_count', 'sum')
+    ).reset_index()
+
+# الرسوم البيانية تتحدد بالكامل بتركيبة (منتج، منطقة)، لذا تُبنى مرة واحدة لكل تركيبة
+@st.cache_resource
+def build_overview_figures(_df, product, region):
+    price_trend = _df.groupby('date')['price'].mean().reset_index()
+    trend_fig = px.line(price_trend, x='date', y='price', title='متوسط الأسعار اليومية')
     
-    df['is_anomaly'] = df['price'] > threshold
-    return df
+    by_company = build_company_summary(_df, product, region)
+    prices_fig = px.bar(by_company, x='company', y='price_mean', labels={'price_mean': 'price'},
+                        title='متوسط الأسعار حسب الشركة')
+    complaints_fig = px.pie(by_company, values='complaint_count', names='company', 
+                            title='توزيع الشكاوى بين الشركات')
+    return trend_fig, prices_fig, complaints_fig
+
+@st.cache_resource
+def build_price_analysis_figures(_df, product, region):
+    box_fig = px.box(_df, x='company', y='price', title='توزيع الأسعار لكل شركة')
+    
+    # استخدام بيانات كاملة للمقارنة الإقليمية
+    region_comparison = _df.groupby('region', observed=True)['price'].mean().reset_index()
+    region_fig = px.bar(region_comparison, x='region', y='price', title='متوسط الأسعار حسب المنطقة')
+    
+    price_stability = build_company_summary(_df, product, region).sort_values('price_std', ascending=False)
+    stability_fig = px.bar(price_stability, x='company', y='price_std', labels={'price_std': 'price'},
+                           title='الانحراف المعياري للأسعار (مؤشر عدم الاستقرار)')
+    return box_fig, region_fig, stability_fig
+
+@st.cache_resource
+def build_anomaly_figures(_df, _mask, product, region):
+    # القناع يُمرر مباشرة كلون للنقاط دون إضافة عمود is_anomaly إلى نسخة من البيانات
+    scatter_fig = px.scatter(_df, x='date', y='price', color=_mask, labels={'color': 'is_anomaly'},
+                             title='كشف الشذوذ في الأسعار (النقاط الحمراء تمثل شذوذ)',
+                             color_discrete_map={True: 'red', False: 'blue'})
+    
+    anomaly_stats = _df.iloc[_mask].groupby('company', observed=True).size().reset_index(name='anomaly_count')
+    stats_fig = px.bar(anomaly_stats, x='company', y='anomaly_count', 
+                       title='عدد حالات الشذوذ لكل شركة')
+    return scatter_fig, stats_fig
+
+@st.cache_resource
+def build_report_figure(_df, product, region, metric):
+    return px.scatter(_df, x='date', y=metric, color='company',
+                      title=f'تطور {metric} مع الزمن',
+                      hover_data=['price', 'complaint_count'])
+
+# كشف الشذوذ بدون scikit-learn
+def anomaly_mask(prices):
+    """كشف شذوذ مبسط باستخدام القيم المتطرفة الإحصائية، يعيد قناعاً منطقياً للأسعار الشاذة"""
+    threshold = prices.mean() + 2 * prices.std(ddof=1)
+    return prices > threshold
 
 # إعداد صفحة Streamlit
 st.set_page_config(page_title="منصة ذكاء المنافسة", page_icon="📊", layout="wide")
@@ -93,25 +167,23 @@ def main():
             "نوع التحليل:",
             ["نظرة عامة", "تحليل الأسعار", "كشف الشذوذ", "التقارير"]
         )
-        selected_product = st.selectbox("اختر المنتج:", data['product'].unique())
-        selected_region = st.selectbox("اختر المنطقة:", data['region'].unique())
+        selected_product = st.selectbox("اختر المنتج:", data['product'].cat.categories)
+        selected_region = st.selectbox("اختر المنطقة:", data['region'].cat.categories)
     
     # تصفية البيانات
-    filtered_data = data[
-        (data['product'] == selected_product) & 
-        (data['region'] == selected_region)
-    ]
+    slice_index = build_slice_index(data)
+    filtered_data = data.take(slice_index[(selected_product, selected_region)])
     
     if analysis_type == "نظرة عامة":
-        display_overview(filtered_data)
+        display_overview(filtered_data, selected_product, selected_region)
     elif analysis_type == "تحليل الأسعار":
-        display_price_analysis(filtered_data)
+        display_price_analysis(filtered_data, selected_product, selected_region)
     elif analysis_type == "كشف الشذوذ":
-        display_anomaly_detection(filtered_data)
+        display_anomaly_detection(filtered_data, selected_product, selected_region)
     else:
-        display_reports(filtered_data)
+        display_reports(filtered_data, selected_product, selected_region)
 
-def display_overview(df):
+def display_overview(df, product, region):
     st.markdown('<div class="section-header">📈 النظرة العامة</div>', unsafe_allow_html=True)
     
     # مؤشرات الأداء
@@ -126,104 +198,79 @@ def display_overview(df):
         st.metric("أعلى سعر", f"{df['price'].max():.2f} ريال")
     
     # الرسوم البيانية
+    trend_fig, prices_fig, complaints_fig = build_overview_figures(df, product, region)
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**تطور الأسعار**")
-        price_trend = df.groupby('date')['price'].mean().reset_index()
-        fig = px.line(price_trend, x='date', y='price', title='متوسط الأسعار اليومية')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(trend_fig, width='stretch')
     
     with col2:
         st.markdown("**مقارنة الشركات**")
-        company_prices = df.groupby('company')['price'].mean().reset_index()
-        fig = px.bar(company_prices, x='company', y='price', title='متوسط الأسعار حسب الشركة')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(prices_fig, width='stretch')
     
     # تحليل إضافي
     st.markdown("**تحليل الشكاوى**")
-    complaints_by_company = df.groupby('company')['complaint_count'].sum().reset_index()
-    fig = px.pie(complaints_by_company, values='complaint_count', names='company', 
-                 title='توزيع الشكاوى بين الشركات')
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(complaints_fig, width='stretch')
 
-def display_price_analysis(df):
+def display_price_analysis(df, product, region):
     st.markdown('<div class="section-header">💰 تحليل الأسعار</div>', unsafe_allow_html=True)
     
+    box_fig, region_fig, stability_fig = build_price_analysis_figures(df, product, region)
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**توزيع الأسعار**")
-        fig = px.box(df, x='company', y='price', title='توزيع الأسعار لكل شركة')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(box_fig, width='stretch')
     
     with col2:
         st.markdown("**مقارنة المناطق**")
-        # استخدام بيانات كاملة للمقارنة الإقليمية
-        region_comparison = df.groupby('region')['price'].mean().reset_index()
-        fig = px.bar(region_comparison, x='region', y='price', title='متوسط الأسعار حسب المنطقة')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(region_fig, width='stretch')
     
     # تحليل الانحراف المعياري
     st.markdown("**تحليل استقرار الأسعار**")
-    price_stability = df.groupby('company')['price'].std().reset_index()
-    price_stability = price_stability.sort_values('price', ascending=False)
-    
-    fig = px.bar(price_stability, x='company', y='price', 
-                 title='الانحراف المعياري للأسعار (مؤشر عدم الاستقرار)')
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(stability_fig, width='stretch')
 
-def display_anomaly_detection(df):
+def display_anomaly_detection(df, product, region):
     st.markdown('<div class="section-header">🔍 كشف الشذوذ</div>', unsafe_allow_html=True)
     
     # كشف الشذوذ المبسط
-    anomaly_data = detect_anomalies_simple(df)
-    anomalies = anomaly_data[anomaly_data['is_anomaly'] == True]
+    mask = anomaly_mask(df['price'].to_numpy())
+    anomalies = df.iloc[mask]
     
     if not anomalies.empty:
         st.markdown(f'<div class="danger-box">🚨 تم كشف {len(anomalies)} حالة شاذة</div>', unsafe_allow_html=True)
         
-        for _, anomaly in anomalies.iterrows():
-            st.markdown(f"""
-            <div class="warning-box">
-                <strong>تنبيه:</strong> {anomaly['company']} - {anomaly['product']}<br>
-                <strong>السعر:</strong> {anomaly['price']} ريال | 
-                <strong>التاريخ:</strong> {anomaly['date'].strftime('%Y-%m-%d')}
-            </div>
-            """, unsafe_allow_html=True)
+        # بناء كل التنبيهات دفعة واحدة (بحد أقصى 50) وعرضها في عنصر واحد
+        shown = anomalies.head(50)
+        alerts = (
+            '<div class="warning-box"><strong>تنبيه:</strong> ' + shown['company'].astype(str)
+            + ' - ' + shown['product'].astype(str)
+            + '<br><strong>السعر:</strong> ' + shown['price'].astype(str)
+            + ' ريال | <strong>التاريخ:</strong> ' + shown['date'].dt.strftime('%Y-%m-%d')
+            + '</div>'
+        )
+        st.markdown('\n'.join(alerts.tolist()), unsafe_allow_html=True)
         
         # رسم بياني للشذوذ
-        fig = px.scatter(anomaly_data, x='date', y='price', color='is_anomaly',
-                        title='كشف الشذوذ في الأسعار (النقاط الحمراء تمثل شذوذ)',
-                        color_discrete_map={True: 'red', False: 'blue'})
-        st.plotly_chart(fig, use_container_width=True)
+        scatter_fig, stats_fig = build_anomaly_figures(df, mask, product, region)
+        st.plotly_chart(scatter_fig, width='stretch')
     else:
         st.markdown('<div class="warning-box">✅ لا توجد حالات شذوذ في الفترة المحددة</div>', unsafe_allow_html=True)
     
     # إحصائيات الشذوذ
     st.markdown("**إحصائيات الشذوذ**")
     if not anomalies.empty:
-        anomaly_stats = anomalies.groupby('company').size().reset_index(name='anomaly_count')
-        fig = px.bar(anomaly_stats, x='company', y='anomaly_count', 
-                     title='عدد حالات الشذوذ لكل شركة')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(stats_fig, width='stretch')
 
-def display_reports(df):
+def display_reports(df, product, region):
     st.markdown('<div class="section-header">📋 التقارير</div>', unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**تقرير أداء الشركات**")
-        company_report = df.groupby('company').agg({
-            'price': ['mean', 'std', 'min', 'max'],
-            'complaint_count': 'sum',
-            'market_share': 'mean'
-        }).round(2)
-        
-        # تبسيط الأعمدة المتعددة المستويات
-        company_report.columns = ['_'.join(col).strip() for col in company_report.columns.values]
-        st.dataframe(company_report)
+        st.dataframe(build_company_report(df, product, region))
     
     with col2:
         st.markdown("**مؤشرات الأداء**")
@@ -244,10 +291,7 @@ def display_reports(df):
     
     selected_metric = st.selectbox("اختر المقياس:", ['price', 'complaint_count', 'market_share'])
     
-    fig = px.scatter(df, x='date', y=selected_metric, color='company',
-                    title=f'تطور {selected_metric} مع الزمن',
-                    hover_data=['price', 'complaint_count'])
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_report_figure(df, product, region, selected_metric), width='stretch')
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+
+# حدود فترات السيناريوهات كأيام منذ 2024-01-01 (سنة كبيسة)، لمقارنات عددية بدلاً من التواريخ
+MAR_1, MAY_31, JUN_1, AUG_31, SEP_1 = 60, 151, 152, 243, 244
 
 class CompetitionDataGenerator:
     def __init__(self):
@@ -11,91 +13,112 @@ class CompetitionDataGenerator:
             'مجموعة الأسواق المركزية', 'شركة المستهلك المتحدة', 'مؤسسة التجارة المتطورة',
             'شركة التجزئة الكبرى', 'مجموعة التموين الشامل'
         ]
+        self.scenario_types = [
+            'ارتفاع أسعار غير مبرر', 'انخفاض أسعار مشبوه (إغراق)', 'تغير أسعار متزامن (تكتل)',
+            'تفاوت أسعار جغرافي', 'تقلبات أسعار شديدة', 'طبيعي'
+        ]
+        # الأسعار الأساسية بنفس ترتيب self.products
+        self._base_prices = np.array([3.5, 8.0, 15.0, 2.5, 25.0, 12.0, 4.0, 1.0], dtype=np.float32)
+        # جداول رموز السيناريو بترتيب شروط get_scenario_codes: معامل السعر، انحراف التباين العشوائي،
+        # وموقع التصنيف في self.scenario_types. الرمزان 5 و6 هما استمرار تصنيف الرياض وجدة بعد
+        # انتهاء فترة السعر، فيأخذان تباين الحالة الطبيعية مع تصنيف السيناريو
+        self._scenario_multipliers = np.array([1.4, 0.6, 1.25, 1.3, 1.0, 1.0, 1.0, 1.0])
+        self._scenario_noise = np.array([0.0, 0.0, 0.0, 0.0, 0.2, 0.05, 0.05, 0.05])
+        self._scenario_labels = np.array([0, 1, 2, 3, 4, 0, 1, 5], dtype=np.int8)
         
     def generate_comprehensive_data(self):
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+        n_products, n_regions, n_companies = len(self.products), len(self.regions), len(self.companies)
+        n = len(dates) * n_products * n_regions * n_companies
         
-        data = []
-        for date in dates:
-            for product in self.products:
-                for region in self.regions:
-                    for company in self.companies:
-                        base_prices = {
-                            'سكر': 3.5, 'أرز': 8.0, 'زيت طهي': 15.0, 'دقيق': 2.5, 
-                            'قهوة': 25.0, 'شاي': 12.0, 'حليب': 4.0, 'خبز': 1.0
-                        }
-                        base_price = base_prices[product]
-                        price = self.apply_scenarios(date, product, region, company, base_price)
-                        complaint_count = self.generate_complaints(date, product, region, company)
-                        market_share = self.generate_market_share(product, region, company)
-                        
-                        data.append({
-                            'date': date, 'product': product, 'region': region, 'company': company,
-                            'price': round(price, 2), 'complaint_count': complaint_count,
-                            'market_share': round(market_share, 2),
-                            'scenario_type': self.get_scenario_type(date, product, region, company)
-                        })
+        # الضرب الديكارتي بنفس ترتيب الصفوف: التاريخ ثم المنتج ثم المنطقة ثم الشركة
+        day_idx = np.repeat(np.arange(len(dates), dtype=np.int32), n_products * n_regions * n_companies)
+        product_idx = np.tile(np.repeat(np.arange(n_products), n_regions * n_companies), len(dates))
+        region_idx = np.tile(np.repeat(np.arange(n_regions), n_companies), len(dates) * n_products)
+        company_idx = np.tile(np.arange(n_companies), len(dates) * n_products * n_regions)
         
-        return pd.DataFrame(data)
-    
-    def apply_scenarios(self, date, product, region, company, base_price):
-        price = base_price
+        base_price = self._base_prices[product_idx]
+        scenario_codes = self.get_scenario_codes(day_idx, product_idx, region_idx, company_idx)
+        price = self.apply_scenarios(rng, scenario_codes, base_price)
+        complaint_count = self.generate_complaints(rng, day_idx, product_idx, region_idx, company_idx)
+        market_share = self.generate_market_share(rng, product_idx, region_idx, company_idx)
         
-        if (region == 'الرياض' and company == 'شركة الأغذية الوطنية' 
-            and date >= datetime(2024, 6, 1) and date <= datetime(2024, 8, 31)):
-            price *= 1.4
-        elif (region == 'جدة' and company == 'مؤسسة التسويق الحديث' 
-              and date >= datetime(2024, 3, 1) and date <= datetime(2024, 5, 31)):
-            price *= 0.6
-        elif (product in ['سكر', 'دقيق'] and date >= datetime(2024, 9, 1) 
-              and company in ['شركة التوزيع المتكامل', 'مجموعة الأسواق المركزية', 'شركة المستهلك المتحدة']):
-            price *= 1.25
-        elif region == 'حائل' and product == 'زيت طهي':
-            price *= 1.3
-        elif company == 'مجموعة التموين الشامل' and product == 'قهوة':
-            daily_variation = np.random.normal(0, 0.2)
-            price *= (1 + daily_variation)
-        else:
-            normal_variation = np.random.normal(0, 0.05)
-            price *= (1 + normal_variation)
-        
-        return max(price, base_price * 0.5)
+        # الأعمدة النصية تُخزن كـ Categorical مبنية مباشرة من مصفوفات الفهارس، والرقمية
+        # بأصغر نوع يتسع لقيمها (float32/int16)،
+        # والمصفوفات المولدة حديثاً تُستخدم كما هي دون نسخها (copy=False)
+        return pd.DataFrame({
+            'date': dates.values[day_idx],
+            'product': pd.Categorical.from_codes(product_idx, categories=self.products),
+            'region': pd.Categorical.from_codes(region_idx, categories=self.regions),
+            'company': pd.Categorical.from_codes(company_idx, categories=self.companies),
+            'price': np.round(price, 2).astype(np.float32),
+            'complaint_count': complaint_count.astype(np.int16),
+            'market_share': np.round(market_share, 2).astype(np.float32),
+            'scenario_type': pd.Categorical.from_codes(self._scenario_labels[scenario_codes],
+                                                       categories=self.scenario_types)
+        }, copy=False)
+    
+    def _lookup_mask(self, names, selected, codes):
+        # جدول منطقي بحجم القائمة يُفهرس بمصفوفة الرموز، أسرع من np.isin للرموز الصغيرة
+        table = np.zeros(len(names), dtype=bool)
+        table[[names.index(name) for name in selected]] = True
+        return table[codes]
+    
+    def _is_product(self, product_idx, *products):
+        return self._lookup_mask(self.products, products, product_idx)
+    
+    def _is_region(self, region_idx, region):
+        return region_idx == self.regions.index(region)
+    
+    def _is_company(self, company_idx, *companies):
+        return self._lookup_mask(self.companies, companies, company_idx)
+    
+    def get_scenario_codes(self, day_idx, product_idx, region_idx, company_idx):
+        # رمز السيناريو يُحسب مرة واحدة ويُفهرس به جدولا السعر والتصنيف في __init__
+        # np.select يختار أول شرط متحقق كما في سلسلة if/elif
+        riyadh_national = (self._is_region(region_idx, 'الرياض')
+                           & self._is_company(company_idx, 'شركة الأغذية الوطنية'))
+        jeddah_marketing = (self._is_region(region_idx, 'جدة')
+                            & self._is_company(company_idx, 'مؤسسة التسويق الحديث'))
+        conditions = [
+            riyadh_national & (day_idx >= JUN_1) & (day_idx <= AUG_31),
+            jeddah_marketing & (day_idx >= MAR_1) & (day_idx <= MAY_31),
+            self._is_product(product_idx, 'سكر', 'دقيق') & (day_idx >= SEP_1)
+            & self._is_company(company_idx, 'شركة التوزيع المتكامل', 'مجموعة الأسواق المركزية',
+                               'شركة المستهلك المتحدة'),
+            self._is_region(region_idx, 'حائل') & self._is_product(product_idx, 'زيت طهي'),
+            self._is_company(company_idx, 'مجموعة التموين الشامل') & self._is_product(product_idx, 'قهوة'),
+            riyadh_national & (day_idx > AUG_31),
+            jeddah_marketing & (day_idx > MAY_31),
+        ]
+        return np.select(conditions, range(len(conditions)), default=len(conditions)).astype(np.int8)
     
-    def generate_complaints(self, date, product, region, company):
-        base_complaints = np.random.poisson(2)
-        if (region == 'الرياض' and company == 'شركة الأغذية الوطنية' 
-            and date >= datetime(2024, 6, 1)):
-            base_complaints += np.random.poisson(5)
-        elif (company == 'مؤسسة التسويق الحديث' and product in ['حليب', 'خبز']):
-            base_complaints += np.random.poisson(3)
-        return max(base_complaints, 0)
+    def apply_scenarios(self, rng, scenario_codes, base_price):
+        noise = rng.normal(0, self._scenario_noise[scenario_codes])
+        multiplier = self._scenario_multipliers[scenario_codes] + noise
+        return np.maximum(base_price * multiplier, base_price * 0.5)
     
-    def generate_market_share(self, product, region, company):
-        base_share = np.random.normal(12.5, 3)
-        if (company == 'شركة الأغذية الوطنية' and region == 'الرياض' 
-            and product in ['سكر', 'دقيق']):
-            base_share = np.random.normal(35, 5)
-        elif region == 'جدة' and product == 'قهوة':
-            base_share = np.random.normal(8, 2)
-        return max(min(base_share, 50), 1)
+    def generate_complaints(self, rng, day_idx, product_idx, region_idx, company_idx):
+        # مجموع توزيعَي بواسون توزيع بواسون بمجموع المعدلين، فتُسحب الشكاوى الإضافية مع الأساسية دفعة واحدة
+        lam = np.full(len(day_idx), 2.0)
+        riyadh_national = (self._is_region(region_idx, 'الرياض')
+                           & self._is_company(company_idx, 'شركة الأغذية الوطنية')
+                           & (day_idx >= JUN_1))
+        lam[riyadh_national] += 5.0
+        marketing_perishables = (~riyadh_national & self._is_company(company_idx, 'مؤسسة التسويق الحديث')
+                                 & self._is_product(product_idx, 'حليب', 'خبز'))
+        lam[marketing_perishables] += 3.0
+        return rng.poisson(lam)
     
-    def get_scenario_type(self, date, product, region, company):
-        if (region == 'الرياض' and company == 'شركة الأغذية الوطنية' 
-            and date >= datetime(2024, 6, 1)):
-            return "ارتفاع أسعار غير مبرر"
-        elif (region == 'جدة' and company == 'مؤسسة التسويق الحديث' 
-              and date >= datetime(2024, 3, 1)):
-            return "انخفاض أسعار مشبوه (إغراق)"
-        elif (product in ['سكر', 'دقيق'] and date >= datetime(2024, 9, 1) 
-              and company in ['شركة التوزيع المتكامل', 'مجموعة الأسواق المركزية', 'شركة المستهلك المتحدة']):
-            return "تغير أسعار متزامن (تكتل)"
-        elif region == 'حائل' and product == 'زيت طهي':
-            return "تفاوت أسعار جغرافي"
-        elif company == 'مجموعة التموين الشامل' and product == 'قهوة':
-            return "تقلبات أسعار شديدة"
-        else:
-            return "طبيعي"
+    def generate_market_share(self, rng, product_idx, region_idx, company_idx):
+        share = rng.normal(12.5, 3, len(product_idx))
+        dominant = (self._is_company(company_idx, 'شركة الأغذية الوطنية') & self._is_region(region_idx, 'الرياض')
+                    & self._is_product(product_idx, 'سكر', 'دقيق'))
+        share[dominant] = rng.normal(35, 5, dominant.sum())
+        jeddah_coffee = self._is_region(region_idx, 'جدة') & self._is_product(product_idx, 'قهوة')
+        share[jeddah_coffee] = rng.normal(8, 2, jeddah_coffee.sum())
+        return np.clip(share, 1, 50)
 
 def get_analysis_insights(df):
     insights = []
@@ -119,6 +142,6 @@ def get_statistical_summary(df):
         "date_range": {"start": df['date'].min().strftime('%Y-%m-%d'), "end": df['date'].max().strftime('%Y-%m-%d')},
         "products_count": df['product'].nunique(), "regions_count": df['region'].nunique(), 
         "companies_count": df['company'].nunique(), "total_complaints": df['complaint_count'].sum(),
-        "avg_price_by_product": df.groupby('product')['price'].mean().to_dict(),
+        "avg_price_by_product": df.groupby('product', observed=True)['price'].mean().to_dict(),
         "scenario_distribution": df['scenario_type'].value_counts().to_dict()
     }